@@ -4,20 +4,35 @@ Modern async torrent client with real-time updates
 """
 
 import os
+import re
 import asyncio
 import logging
 import time
 import uuid
+import bisect
 import json
+import shutil
+import tempfile
 import zipfile
+import zlib
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import quote
 
 import libtorrent as lt
 import httpx
+import orjson
+from zipstream import ZipStream
+try:
+    from zlib_ng import zlib_ng  # zlib-compatible, much faster at low compression levels
+except ImportError:
+    zlib_ng = None
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import ORJSONResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
@@ -53,6 +68,180 @@ LISTEN_PORT_END = int(os.getenv("LISTEN_PORT_END", "6889"))
 DHT_ENABLED = os.getenv("DHT_ENABLED", "true").lower() == "true"
 REQUIRE_AUTH = os.getenv("REQUIRE_AUTH", "false").lower() == "true"
 API_KEY = os.getenv("API_KEY", "")
+# Disk I/O threads. Keep this modest: many aio threads contend on shared disks.
+# libtorrent 2.0 has no block cache of its own (the OS page cache does that work);
+# for seedbox throughput tune send_buffer_watermark and connection_speed instead.
+AIO_THREADS = int(os.getenv("AIO_THREADS", "4"))
+# Per-handle connection/upload/priority tweaks on every add. Off by default:
+# session-wide connections_limit and default trackers cover headless seedboxes.
+BOOST_PER_TORRENT = os.getenv("BOOST_PER_TORRENT", "false").lower() == "true"
+DEBUG_ALERTS = os.getenv("DEBUG_ALERTS", "false").lower() == "true"  # Log DHT/peer/torrent events
+
+# How often libtorrent is asked for changed torrent statuses (seconds), by activity
+STATUS_INTERVAL_LIVE = 0.1  # Clients connected and a torrent is moving
+STATUS_INTERVAL_IDLE = 2.0  # Clients but nothing moving, or torrents moving unwatched
+STATUS_INTERVAL_DORMANT = 30.0  # No clients and nothing moving
+# torrent_handle::query_name; the 2.0 bindings don't export the status query flags
+STATUS_QUERY_NAME = getattr(lt.torrent_handle, 'query_name', 64)
+# Pause after an unexpected monitor error so a persistent failure can't spin the loop
+MONITOR_ERROR_BACKOFF = 1.0
+# Torrent states that count as moving even without download rate
+BUSY_STATES = frozenset({'checking_files', 'downloading_metadata', 'checking_resume_data', 'allocating'})
+
+# Per-client send budget for a broadcast frame before the client is dropped (seconds)
+WS_SEND_TIMEOUT = 2.0
+# Frames buffered per client before its backlog is replaced by one full snapshot
+WS_QUEUE_SIZE = 32
+
+# Alert categories consumed by process_alerts. Subscribing to everything
+# floods the alert queue and can drop the alerts we actually need.
+ALERT_MASK = int(
+    lt.alert.category_t.status_notification
+    | lt.alert.category_t.error_notification
+    | lt.alert.category_t.storage_notification
+    | lt.alert.category_t.performance_warning
+    | lt.alert.category_t.tracker_notification
+)
+if DEBUG_ALERTS:
+    ALERT_MASK |= int(
+        lt.alert.category_t.dht_notification
+        | lt.alert.category_t.peer_notification
+        | lt.alert.category_t.torrent_log_notification
+    )
+
+# Comprehensive public tracker list for maximum peer discovery (deduplicated, order kept)
+PUBLIC_TRACKERS: Tuple[str, ...] = tuple(dict.fromkeys([
+    "udp://tracker.opentrackr.org:1337/announce",
+    "udp://open.stealth.si:80/announce",
+    "udp://tracker.torrent.eu.org:451/announce",
+    "udp://tracker.bittor.pw:1337/announce",
+    "udp://public.popcorn-tracker.org:6969/announce",
+    "udp://tracker.dler.org:6969/announce",
+    "udp://exodus.desync.com:6969/announce",
+    "udp://open.demonii.com:1337/announce",
+    "udp://tracker.openbittorrent.com:6969/announce",
+    "udp://tracker.coppersurfer.tk:6969/announce",
+    "udp://tracker.leechers-paradise.org:6969/announce",
+    "udp://tracker.internetwarriors.net:1337/announce",
+    "udp://tracker.opentrackr.org:1337/announce",
+    "udp://9.rarbg.to:2710/announce",
+    "udp://9.rarbg.me:2710/announce",
+    "udp://tracker.cyberia.is:6969/announce",
+    "udp://tracker.opentrackr.org:1337/announce",
+    "udp://retracker.lanta-net.ru:2710/announce",
+    "udp://bt.xxx-tracker.com:2710/announce",
+    "http://tracker.openbittorrent.com:80/announce",
+    "udp://opentor.org:2710/announce",
+]))
+# Spread over tiers 0-2 (best-known first) so libtorrent falls back tier by tier
+# instead of announcing to every tracker at once
+PUBLIC_TRACKER_TIERS: Tuple[int, ...] = tuple(i * 3 // len(PUBLIC_TRACKERS) for i in range(len(PUBLIC_TRACKERS)))
+
+# Setting names known to this libtorrent build (unknown names are rejected)
+LT_SETTING_NAMES = frozenset(lt.default_settings())
+
+# Newer libtorrent builds can attach these to every torrent from the session itself
+SESSION_DEFAULT_TRACKERS = 'default_trackers' in LT_SETTING_NAMES
+
+# Browser-like headers for .torrent downloads (set once on the shared HTTP client)
+_BASE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0',
+}
+
+# Deflate for compress=true zips: zlib-ng when available, same DEFLATE output either way
+_zlib = zlib_ng if zlib_ng is not None else zlib
+
+# Read/copy size for zip building, and how many files are deflated at once across
+# all zip builds (also the most finished-but-unwritten parts one build holds)
+ZIP_CHUNK_SIZE = 1024 * 1024
+ZIP_WORKERS = os.cpu_count() or 2
+# Read size when serving files from disk
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# Characters stripped from torrent names before use as a download filename
+_SAFE_TRANS = str.maketrans('', '', '\\/:*?"<>|')
+
+# Info-hash patterns: a bare 40-char hex hash, and one embedded in a URL
+_HEX40_RE = re.compile(r'\A[0-9A-Fa-f]{40}\Z')
+_INFO_HASH_RE = re.compile(r'([0-9A-Fa-f]{40})')
+
+def content_disposition(filename: str) -> str:
+    """Attachment header value, RFC 5987-encoded when the name is not plain ASCII"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def describe_non_torrent(preview: bytes) -> str:
+    """Error message for a download that isn't bencode (error path only)"""
+    # Try to parse as text to give better error
+    text_preview = preview[:200].decode('utf-8', errors='ignore')
+    if 'html' in text_preview.lower() or '<' in text_preview:
+        return "Received HTML instead of torrent file. The site may be blocking automated downloads."
+    return "Downloaded file is not a valid torrent file (invalid bencode format)"
+
+def info_hash_keys(hashes) -> Tuple[str, ...]:
+    """Dict keys for a libtorrent info-hash (info_hash_t or legacy sha1_hash), v1 first.
+    A hybrid torrent added from a v1-only magnet gains its v2 hash with the metadata,
+    so lookups have to try both."""
+    if not hasattr(hashes, 'has_v1'):
+        return (str(hashes),)
+    keys = []
+    if hashes.has_v1():
+        keys.append(str(hashes.v1))
+    if hashes.has_v2():
+        keys.append(str(hashes.v2))
+    return tuple(keys)
+
+def info_hash_key(hashes) -> str:
+    """Key a torrent is registered under: its v1 hash when it has one, else v2"""
+    return info_hash_keys(hashes)[0]
+
+def deflate_to_temp(file_entry: dict) -> Tuple[zipfile.ZipInfo, BinaryIO]:
+    """Deflate one file into an anonymous temp file; returns its ZipInfo and the data.
+    zlib releases the GIL while compressing, so several of these run in parallel."""
+    path = file_entry["absolute_path"]
+    zinfo = zipfile.ZipInfo.from_file(path, arcname=file_entry["relative_path"])
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    compressor = _zlib.compressobj(1, _zlib.DEFLATED, -15)  # Raw deflate, as zip expects
+    crc = 0
+    size = 0
+    part = tempfile.TemporaryFile(dir=TEMP_DIR)
+    try:
+        with open(path, "rb") as src:
+            while chunk := src.read(ZIP_CHUNK_SIZE):
+                crc = _zlib.crc32(chunk, crc)
+                size += len(chunk)
+                part.write(compressor.compress(chunk))
+        part.write(compressor.flush())
+    except BaseException:
+        part.close()
+        raise
+    zinfo.CRC = crc
+    zinfo.file_size = size
+    zinfo.compress_size = part.tell()
+    part.seek(0)
+    return zinfo, part
+
+def append_deflated(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, part: BinaryIO) -> None:
+    """Append an entry compressed by deflate_to_temp. zipfile has no public API for
+    pre-compressed data, so write the local header ourselves and register the
+    entry; close() then writes the central directory (zip64 included) as usual."""
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    shutil.copyfileobj(part, zipf.fp, ZIP_CHUNK_SIZE)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
 
 # -----------------------
 # Models
@@ -69,7 +258,11 @@ class TorrentAddRequest(BaseModel):
         """Get the URL, supporting both 'url' and 'magnet' fields"""
         return self.url if self.url else (self.magnet or "")
 
-class TorrentInfo(BaseModel):
+@dataclass(slots=True)
+class TorrentInfo:
+    """Torrent status as served by the API. A plain slots dataclass rather than a
+    Pydantic model: it is built on every status alert and serialized on every
+    broadcast, and orjson encodes dataclasses natively."""
     id: str
     name: str
     state: str
@@ -86,22 +279,85 @@ class TorrentInfo(BaseModel):
     save_path: str
     added_time: float
 
+    def to_dict(self) -> dict:
+        """Plain dict of the fields, for diffing against the last broadcast"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'state': self.state,
+            'progress': self.progress,
+            'download_rate': self.download_rate,
+            'upload_rate': self.upload_rate,
+            'num_peers': self.num_peers,
+            'num_seeds': self.num_seeds,
+            'total_size': self.total_size,
+            'downloaded': self.downloaded,
+            'uploaded': self.uploaded,
+            'ratio': self.ratio,
+            'eta': self.eta,
+            'save_path': self.save_path,
+            'added_time': self.added_time,
+        }
+
 class TorrentFileInfo(BaseModel):
     path: str
     size: int
     progress: float
 
+@dataclass(slots=True)
+class TorrentRecord:
+    """Everything tracked for one torrent, so hot paths do a single lookup by id"""
+    metadata: dict
+    handle: Optional[lt.torrent_handle] = None  # None while the async add is pending or once stopped
+    info: Optional[TorrentInfo] = None  # Latest live status, refreshed from state_update_alert
+    completed_info: Optional[TorrentInfo] = None  # Frozen snapshot after stop-on-complete
+    completed_files: Optional[dict] = None  # Files snapshot for downloads after stop-on-complete
+    hash_key: Optional[str] = None  # Our _hash_to_id entry while the torrent is in the session
+
+@dataclass(slots=True)
+class ClientRelay:
+    """A WebSocket client with its own outbound queue, drained by a relay task"""
+    websocket: WebSocket
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=WS_QUEUE_SIZE))
+    task: Optional[asyncio.Task] = None
+
 # -----------------------
 # Torrent Manager
 # -----------------------
 class TorrentManager:
     def __init__(self):
         self.session: Optional[lt.session] = None
-        self.torrents: Dict[str, lt.torrent_handle] = {}
-        self.torrent_metadata: Dict[str, dict] = {}
-        self.websocket_clients: List[WebSocket] = []
-        self.completed_torrents: Dict[str, TorrentInfo] = {}
-        self.completed_files: Dict[str, dict] = {}
+        self.records: Dict[str, TorrentRecord] = {}
+        # Record ids, newest added first; kept in order on add/remove so listing never sorts
+        self._sorted_ids: List[str] = []
+        self.websocket_clients: Dict[WebSocket, ClientRelay] = {}
+        # Info-hash -> torrent id, so alerts can be routed back to our ids
+        self._hash_to_id: Dict[str, str] = {}
+        # Info-hash -> delete_files for adds removed before their alert arrived
+        self._cancelled_adds: Dict[str, bool] = {}
+        # Shared HTTP client for .torrent downloads (keeps TLS/DNS/connection pool warm)
+        self._http: Optional[httpx.AsyncClient] = None
+        # Zip builds run here, capped so a burst of downloads can't take every core
+        self._zip_executor: Optional[ThreadPoolExecutor] = None
+        # Per-file deflate workers, shared by every zip build
+        self._deflate_executor: Optional[ThreadPoolExecutor] = None
+        # One zip build per torrent at a time; concurrent requests wait and reuse it
+        self._zip_locks: Dict[str, asyncio.Lock] = {}
+        # Last state pushed to WebSocket clients, used to send only deltas
+        self._last_sent: Dict[str, dict] = {}
+        # TorrentInfo objects behind _last_sent; an unchanged object means nothing to diff
+        self._last_infos: Dict[str, TorrentInfo] = {}
+        self._seq = 0
+        # Encoded full-state frame for _last_sent/_seq; None once either moves on
+        self._snapshot_bytes: Optional[bytes] = None
+        # Set to request a broadcast; the worker coalesces bursts into one frame
+        self._bcast_pending = asyncio.Event()
+        # Set from libtorrent's thread when the alert queue becomes non-empty
+        self._alerts_ready = asyncio.Event()
+        # Loop time of the next post_torrent_updates; refresh_status() pulls it forward
+        self._next_status_request = 0.0
+        # Background tasks started by initialize(), cancelled on shutdown
+        self._tasks: List[asyncio.Task] = []
         
     async def initialize(self):
         """Initialize libtorrent session"""
@@ -115,15 +371,14 @@ class TorrentManager:
             'enable_natpmp': True,
             'listen_interfaces': f'0.0.0.0:{LISTEN_PORT_START}',
             'outgoing_interfaces': '',
-            'announce_to_all_trackers': True,
-            'announce_to_all_tiers': True,
+            'announce_to_all_trackers': True,  # Within a tier; next tier only if it fails
+            'announce_to_all_tiers': False,
             'auto_manage_interval': 5,
             'max_failcount': 1,
             
-            # AGGRESSIVE PERFORMANCE SETTINGS
-            'aio_threads': 16,  # More async I/O threads
+            # DISK SETTINGS (see AIO_THREADS)
+            'aio_threads': AIO_THREADS,
             'checking_mem_usage': 4096,  # 4GB for hash checking
-            'cache_size': 16384,  # 16GB cache (seedbox level)
             'cache_expiry': 60,
             'disk_io_write_mode': 0,  # Enable OS cache
             'disk_io_read_mode': 0,
@@ -165,9 +420,13 @@ class TorrentManager:
             
             # ALERTS & MONITORING
             'alert_queue_size': 10000,
-            'alert_mask': 0x7fffffff,
+            'alert_mask': ALERT_MASK,
         }
         
+        # Let libtorrent attach the public trackers itself instead of per-torrent calls
+        if SESSION_DEFAULT_TRACKERS:
+            settings['default_trackers'] = '\n'.join(PUBLIC_TRACKERS)
+        
         self.session = lt.session(settings)
         
         # Set rate limits
@@ -185,13 +444,50 @@ class TorrentManager:
         
         logger.info(f"Session initialized. Listening on port {LISTEN_PORT_START}")
         
-        # Start monitoring task
-        asyncio.create_task(self.monitor_torrents())
+        self._http = httpx.AsyncClient(
+            timeout=30.0,
+            follow_redirects=True,
+            headers=_BASE_HEADERS,
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+        self._zip_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='zipper')
+        self._deflate_executor = ThreadPoolExecutor(max_workers=ZIP_WORKERS, thread_name_prefix='deflate')
+        
+        # Wake the monitor as soon as libtorrent has alerts, instead of polling.
+        # The callback runs on libtorrent's thread and must not touch the session.
+        loop = asyncio.get_running_loop()
+        self.session.set_alert_notify(lambda: loop.call_soon_threadsafe(self._alerts_ready.set))
+        
+        # Start monitoring and broadcast tasks
+        self._tasks = [
+            asyncio.create_task(self.monitor_torrents()),
+            asyncio.create_task(self._broadcast_worker()),
+        ]
     
     async def shutdown(self):
         """Cleanup session"""
         logger.info("Shutting down torrent session...")
+        # Stop background work and client relays first so no task outlives the loop
+        relays = list(self.websocket_clients.values())
+        self.websocket_clients.clear()
+        tasks = self._tasks + [relay.task for relay in relays if relay.task is not None]
+        self._tasks = []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._http:
+            await self._http.aclose()
+            self._http = None
+        if self._zip_executor:
+            self._zip_executor.shutdown(wait=False, cancel_futures=True)
+            self._zip_executor = None
+        if self._deflate_executor:
+            self._deflate_executor.shutdown(wait=False, cancel_futures=True)
+            self._deflate_executor = None
         if self.session:
+            # The event loop is going away; stop libtorrent from scheduling onto it
+            self.session.set_alert_notify(lambda: None)
             self.session.pause()
             
             # Save resume data for all torrents
@@ -199,55 +495,36 @@ class TorrentManager:
         """Download .torrent file from URL with advanced anti-bot bypass"""
         
         # Extract potential info hash from URL for fallback
-        import re
-        hash_match = re.search(r'([0-9A-Fa-f]{40})', url)
+        hash_match = _INFO_HASH_RE.search(url)
         info_hash = hash_match.group(1) if hash_match else None
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0',
-            'Referer': url.split('/torrent/')[0] if '/torrent/' in url else url.rsplit('/', 1)[0]
-        }
+        # Browser-like headers live on the shared client; only Referer varies
+        headers = {'Referer': url.split('/torrent/')[0] if '/torrent/' in url else url.rsplit('/', 1)[0]}
         
         try:
-            async with httpx.AsyncClient(
-                timeout=30.0,
-                follow_redirects=True,
-                headers=headers
-            ) as client:
-                logger.info(f"Downloading torrent from: {url}")
-                response = await client.get(url)
+            logger.info(f"Downloading torrent from: {url}")
+            async with self._http.stream('GET', url, headers=headers) as response:
                 response.raise_for_status()
                 
-                content = response.content
-                
-                # Check if it's actually a torrent file (bencode format)
-                if not content or len(content) < 20:
-                    raise ValueError("Downloaded file is too small to be a valid torrent")
-                
-                # Torrent files start with 'd' (bencode dictionary)
-                if not content.startswith(b'd'):
-                    # Try to parse as text to give better error
-                    try:
-                        text_preview = content[:200].decode('utf-8', errors='ignore')
-                        if 'html' in text_preview.lower() or '<' in text_preview:
-                            raise ValueError("Received HTML instead of torrent file. The site may be blocking automated downloads.")
-                    except:
-                        pass
-                    raise ValueError("Downloaded file is not a valid torrent file (invalid bencode format)")
-                
-                logger.info(f"Successfully downloaded torrent file ({len(content)} bytes)")
-                return content
-                
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes():
+                    if not chunk:
+                        continue
+                    # Torrent files start with 'd' (bencode dictionary); bail out on
+                    # anything else before pulling the rest of e.g. an HTML page
+                    if not buffer and chunk[0] != ord('d'):
+                        raise ValueError(describe_non_torrent(chunk))
+                    buffer += chunk
+            
+            content = bytes(buffer)
+            
+            # Check if it's actually a torrent file (bencode format)
+            if len(content) < 20:
+                raise ValueError("Downloaded file is too small to be a valid torrent")
+            
+            logger.info(f"Successfully downloaded torrent file ({len(content)} bytes)")
+            return content
+            
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 403:
                 logger.error(f"403 Forbidden - Site is blocking the download: {url}")
@@ -284,36 +561,19 @@ class TorrentManager:
         url = url.strip()
         torrent_id = str(uuid.uuid4())
         
-        params = {
-            'save_path': str(save_path or DOWNLOAD_DIR),
-            'storage_mode': lt.storage_mode_t.storage_mode_sparse,
-            'flags': lt.torrent_flags.auto_managed | lt.torrent_flags.duplicate_is_error,
-        }
-        
-        if sequential:
-            params['flags'] |= lt.torrent_flags.sequential_download
-        
         try:
             # Case 1: Magnet link
             if url.lower().startswith('magnet:'):
-                handle = lt.add_magnet_uri(self.session, url, params)
-                self.torrents[torrent_id] = handle
-                self.torrent_metadata[torrent_id] = {
+                params = self._build_add_params(save_path, sequential, magnet=url)
+                self._submit_add(torrent_id, params, {
                     'added_time': time.time(),
                     'source': 'magnet',
                     'url': url,
-                    'save_path': params['save_path'],
+                    'save_path': params.save_path,
                     'stopped_on_complete': False
-                }
-                
-                # Apply speed boost
-                self.boost_torrent_speed(handle)
-                
-                logger.info(f"Added torrent {torrent_id} from magnet link")
-                
-                # Immediately broadcast to WebSocket clients
-                asyncio.create_task(self.broadcast_update())
+                })
                 
+                logger.info(f"Queued torrent {torrent_id} from magnet link")
                 return torrent_id
             
             # Case 2: HTTP(S) URL - download torrent file
@@ -325,51 +585,34 @@ class TorrentManager:
                 torrent_file = TORRENT_DIR / f"{torrent_id}.torrent"
                 torrent_file.write_bytes(torrent_data)
                 
-                # Add to session
-                params['ti'] = lt.torrent_info(str(torrent_file))
-                handle = self.session.add_torrent(params)
-                
-                self.torrents[torrent_id] = handle
-                self.torrent_metadata[torrent_id] = {
+                # Parse off the event loop - large torrents take a while to bdecode
+                torrent_info = await asyncio.to_thread(lt.torrent_info, str(torrent_file))
+                params = self._build_add_params(save_path, sequential, ti=torrent_info)
+                self._submit_add(torrent_id, params, {
                     'added_time': time.time(),
                     'source': 'url',
                     'url': url,
                     'torrent_file': str(torrent_file),
-                    'save_path': params['save_path'],
+                    'save_path': params.save_path,
                     'stopped_on_complete': False
-                }
-                
-                # Apply speed boost
-                self.boost_torrent_speed(handle)
-                
-                logger.info(f"Added torrent {torrent_id} from URL")
-                
-                # Immediately broadcast to WebSocket clients
-                asyncio.create_task(self.broadcast_update())
+                })
                 
+                logger.info(f"Queued torrent {torrent_id} from URL")
                 return torrent_id
             
             # Case 3: Info hash (40 char hex)
-            elif len(url) == 40 and all(c in '0123456789abcdefABCDEF' for c in url):
+            elif _HEX40_RE.match(url):
                 magnet = f"magnet:?xt=urn:btih:{url}"
-                handle = lt.add_magnet_uri(self.session, magnet, params)
-                self.torrents[torrent_id] = handle
-                self.torrent_metadata[torrent_id] = {
+                params = self._build_add_params(save_path, sequential, magnet=magnet)
+                self._submit_add(torrent_id, params, {
                     'added_time': time.time(),
                     'source': 'hash',
                     'hash': url,
-                    'save_path': params['save_path'],
+                    'save_path': params.save_path,
                     'stopped_on_complete': False
-                }
-                
-                # Apply speed boost
-                self.boost_torrent_speed(handle)
-                
-                logger.info(f"Added torrent {torrent_id} from info hash")
-                
-                # Immediately broadcast to WebSocket clients
-                asyncio.create_task(self.broadcast_update())
+                })
                 
+                logger.info(f"Queued torrent {torrent_id} from info hash")
                 return torrent_id
             
             else:
@@ -378,18 +621,138 @@ class TorrentManager:
         except Exception as e:
             logger.error(f"Failed to add torrent: {e}")
             # Cleanup on failure
-            if torrent_id in self.torrent_metadata:
-                metadata = self.torrent_metadata[torrent_id]
-                if 'torrent_file' in metadata:
-                    Path(metadata['torrent_file']).unlink(missing_ok=True)
+            self._forget_record(torrent_id)
+            (TORRENT_DIR / f"{torrent_id}.torrent").unlink(missing_ok=True)
             raise HTTPException(status_code=400, detail=str(e))
     
+    def _build_add_params(self, save_path: Optional[str], sequential: bool,
+                          magnet: Optional[str] = None,
+                          ti: Optional[lt.torrent_info] = None) -> lt.add_torrent_params:
+        """Build add_torrent_params for a magnet link or a parsed .torrent"""
+        params = lt.parse_magnet_uri(magnet) if magnet else lt.add_torrent_params()
+        if ti is not None:
+            params.ti = ti
+        params.save_path = str(save_path or DOWNLOAD_DIR)
+        params.storage_mode = lt.storage_mode_t.storage_mode_sparse
+        # update_subscribe is what makes post_torrent_updates report this torrent
+        params.flags = (lt.torrent_flags.auto_managed
+                        | lt.torrent_flags.duplicate_is_error
+                        | lt.torrent_flags.update_subscribe)
+        
+        # Without session-level default trackers, ship them with the add itself
+        # (one submit, deduplicated against the magnet's own tr= entries)
+        if not SESSION_DEFAULT_TRACKERS:
+            own = list(params.trackers)
+            own_tiers = list(params.tracker_tiers)
+            own_tiers += [0] * (len(own) - len(own_tiers))
+            seen = set(own)
+            extra = [(url, tier) for url, tier in zip(PUBLIC_TRACKERS, PUBLIC_TRACKER_TIERS) if url not in seen]
+            params.trackers = own + [url for url, _ in extra]
+            params.tracker_tiers = own_tiers + [tier for _, tier in extra]
+        
+        if sequential:
+            params.flags |= lt.torrent_flags.sequential_download
+        
+        return params
+
+    @staticmethod
+    def _params_hash_key(params: lt.add_torrent_params) -> str:
+        """Info-hash key for add params, matching what add_torrent_alert reports back"""
+        if params.ti is not None:
+            return info_hash_key(params.ti.info_hashes())
+        return info_hash_key(params.info_hashes)
+
+    def _submit_add(self, torrent_id: str, params: lt.add_torrent_params, metadata: dict):
+        """Hand params to libtorrent without blocking; the handle arrives via add_torrent_alert"""
+        key = self._params_hash_key(params)
+        if key in self._hash_to_id:
+            raise ValueError("Torrent already added")
+        if key in self._cancelled_adds:
+            raise ValueError("Torrent is still being removed, try again shortly")
+        
+        self._hash_to_id[key] = torrent_id
+        self.records[torrent_id] = TorrentRecord(metadata=metadata, hash_key=key)
+        bisect.insort(self._sorted_ids, torrent_id,
+                      key=lambda tid: -self.records[tid].metadata.get('added_time', 0))
+        try:
+            self.session.async_add_torrent(params)
+        except Exception:
+            self._hash_to_id.pop(key, None)
+            self._forget_record(torrent_id)
+            raise
+
+    def _forget_record(self, torrent_id: str) -> Optional[TorrentRecord]:
+        """Drop a record and its place in the listing order"""
+        record = self.records.pop(torrent_id, None)
+        if record is not None:
+            self._sorted_ids.remove(torrent_id)
+        return record
+
+    def _on_add_torrent(self, alert: lt.add_torrent_alert):
+        """Resolve the handle of an async add, or clean up if libtorrent rejected it"""
+        key = self._params_hash_key(alert.params)
+        if key in self._cancelled_adds:
+            delete_files = self._cancelled_adds.pop(key)
+            if not alert.error.value():
+                if delete_files:
+                    self.session.remove_torrent(alert.handle, lt.options_t.delete_files)
+                else:
+                    self.session.remove_torrent(alert.handle)
+            return
+        
+        torrent_id = self._hash_to_id.get(key)
+        record = self.records.get(torrent_id)
+        if record is None:
+            return
+        
+        if alert.error.value():
+            logger.error(f"Failed to add torrent {torrent_id}: {alert.error.message()}")
+            self._hash_to_id.pop(key, None)
+            self._forget_record(torrent_id)
+            if 'torrent_file' in record.metadata:
+                Path(record.metadata['torrent_file']).unlink(missing_ok=True)
+            # Clients already list it as "adding"; let them drop the row
+            self.request_broadcast()
+            return
+        
+        handle = alert.handle
+        record.handle = handle
+        # Fallback name for statuses that arrive without one (e.g. before magnet metadata)
+        params = alert.params
+        record.metadata['name'] = params.ti.name() if params.ti is not None else params.name
+        
+        # Apply speed boost
+        if BOOST_PER_TORRENT:
+            self.boost_torrent_speed(handle)
+        
+        logger.info(f"Added torrent {torrent_id} to session")
+        self.refresh_status()
+        
+        # Broadcast to WebSocket clients (coalesced with other adds)
+        self.request_broadcast()
+
+    def _untrack_handle(self, torrent_id: str):
+        """Forget an active handle and its cached status"""
+        record = self.records.get(torrent_id)
+        if record is None:
+            return
+        record.handle = None
+        record.info = None
+        # Keyed from the record: the handle may already be invalid after removal
+        if record.hash_key is not None:
+            self._hash_to_id.pop(record.hash_key, None)
+            record.hash_key = None
+
     def enable_super_seeding(self, torrent_id: str):
         """Enable super-seeding mode for completed torrents to maximize upload speed"""
-        if torrent_id not in self.torrents:
+        if not BOOST_PER_TORRENT:
             return
         
-        handle = self.torrents[torrent_id]
+        record = self.records.get(torrent_id)
+        if record is None or record.handle is None:
+            return
+        
+        handle = record.handle
         status = handle.status()
         
         # Only enable for completed torrents
@@ -406,44 +769,13 @@ class TorrentManager:
                 handle.set_max_uploads(-1)  # Unlimited slots
                 
                 logger.info(f"Super-seeding enabled for {status.name}")
-            except Exception as e:
+            except RuntimeError as e:
                 logger.warning(f"Failed to enable super-seeding: {e}")
     
     def boost_torrent_speed(self, handle: lt.torrent_handle):
         """Apply seedbox-level optimizations to a torrent handle"""
-        # Add comprehensive public tracker list for maximum peer discovery
-        public_trackers = [
-            "udp://tracker.opentrackr.org:1337/announce",
-            "udp://open.stealth.si:80/announce",
-            "udp://tracker.torrent.eu.org:451/announce",
-            "udp://tracker.bittor.pw:1337/announce",
-            "udp://public.popcorn-tracker.org:6969/announce",
-            "udp://tracker.dler.org:6969/announce",
-            "udp://exodus.desync.com:6969/announce",
-            "udp://open.demonii.com:1337/announce",
-            "udp://tracker.openbittorrent.com:6969/announce",
-            "udp://tracker.coppersurfer.tk:6969/announce",
-            "udp://tracker.leechers-paradise.org:6969/announce",
-            "udp://tracker.internetwarriors.net:1337/announce",
-            "udp://tracker.opentrackr.org:1337/announce",
-            "udp://9.rarbg.to:2710/announce",
-            "udp://9.rarbg.me:2710/announce",
-            "udp://tracker.cyberia.is:6969/announce",
-            "udp://tracker.opentrackr.org:1337/announce",
-            "udp://retracker.lanta-net.ru:2710/announce",
-            "udp://bt.xxx-tracker.com:2710/announce",
-            "http://tracker.openbittorrent.com:80/announce",
-            "udp://opentor.org:2710/announce",
-        ]
-        
+        # Public trackers come from the session / add params, not from here
         try:
-            # Add all trackers
-            for tracker in public_trackers:
-                handle.add_tracker({'url': tracker, 'tier': 0})
-            
-            # Force announce to all trackers immediately
-            handle.force_reannounce()
-            
             # Apply HIGH-PERFORMANCE settings for download AND seeding
             handle.set_max_connections(300)  # Per-torrent connection limit (increased)
             handle.set_max_uploads(-1)  # Unlimited upload slots for fast seeding
@@ -454,106 +786,91 @@ class TorrentManager:
             # Priority settings
             handle.set_priority(255)  # Maximum priority
             
-            logger.info(f"Speed boost applied: {len(public_trackers)} trackers, max connections: 300")
-        except Exception as e:
+            logger.info("Speed boost applied: max connections: 300")
+        except RuntimeError as e:
             logger.warning(f"Failed to boost torrent speed: {e}")
 
     def stop_if_completed(self, torrent_id: str, handle: lt.torrent_handle, status: lt.torrent_status):
         """Stop seeding automatically once download finishes (keep files)."""
-        metadata = self.torrent_metadata.get(torrent_id, {})
-        if metadata.get('stopped_on_complete'):
+        record = self.records.get(torrent_id)
+        if record is None or record.metadata.get('stopped_on_complete'):
+            return
+        metadata = record.metadata
+        if not handle.is_valid():
             return
 
         try:
             # Snapshot file list and torrent info before removal
-            try:
-                torrent_info = handle.get_torrent_info()
+            torrent_info = handle.torrent_file()  # None until metadata is known
+            name = torrent_info.name() if torrent_info is not None else (status.name or metadata.get('name', ''))
+            files_snapshot = []
+            if torrent_info is not None:
                 files_storage = torrent_info.files()
-                files_snapshot = []
-                for idx in range(files_storage.num_files()):
+                # Plain string joins; consumers build a Path only when they touch the file
+                base = str(metadata.get('save_path', DOWNLOAD_DIR))
+                num_files = files_storage.num_files()
+                files_snapshot = [None] * num_files
+                for idx in range(num_files):
                     rel_path = files_storage.file_path(idx)
-                    abs_path = Path(metadata.get('save_path', DOWNLOAD_DIR)) / rel_path
-                    files_snapshot.append({
+                    files_snapshot[idx] = {
                         "relative_path": rel_path,
-                        "absolute_path": abs_path,
+                        "rel_norm": rel_path.replace('\\', '/'),
+                        "absolute_path": os.path.join(base, rel_path),
+                        "name": os.path.basename(rel_path),
                         "size": files_storage.file_size(idx)
-                    })
-            except Exception:
-                torrent_info = None
-                files_snapshot = []
+                    }
 
             # Pause torrent and disable uploads
             handle.pause()
             handle.set_upload_limit(0)
             handle.set_max_uploads(0)
             # Avoid super-seeding flags
-            try:
+            if status.flags & lt.torrent_flags.super_seeding:
                 handle.unset_flags(lt.torrent_flags.super_seeding)
-            except Exception:
-                pass
 
             # Snapshot completed torrent for UI and downloads
-            try:
-                ratio = status.all_time_upload / max(status.all_time_download, 1)
-                save_path = metadata.get('save_path', str(DOWNLOAD_DIR))
-                snapshot_time = time.time()
-                completed_info = TorrentInfo(
-                    id=torrent_id,
-                    name=status.name,
-                    state="completed",
-                    progress=100.0,
-                    download_rate=0,
-                    upload_rate=0,
-                    num_peers=0,
-                    num_seeds=0,
-                    total_size=status.total_wanted,
-                    downloaded=status.total_wanted,
-                    uploaded=status.all_time_upload,
-                    ratio=ratio,
-                    eta=0,
-                    save_path=save_path,
-                    added_time=metadata.get('added_time', time.time())
-                )
-                self.completed_torrents[torrent_id] = completed_info
-                self.completed_files[torrent_id] = {
-                    "files": files_snapshot,
-                    "save_path": save_path,
-                    "name": torrent_info.name() if torrent_info else status.name,
-                }
-
-                # Prebuild zip once to make "Download all" instant
-                if len(files_snapshot) > 1:
-                    try:
-                        self.build_zip_if_needed(
-                            torrent_id,
-                            files_snapshot,
-                            torrent_info.name() if torrent_info else status.name,
-                            snapshot_time,
-                        )
-                    except Exception as zip_err:
-                        logger.warning(f"Failed to prebuild zip for {torrent_id}: {zip_err}")
-            except Exception as snap_err:
-                logger.warning(f"Failed to snapshot completed torrent {torrent_id}: {snap_err}")
+            snapshot_time = time.time()
+            ratio = status.all_time_upload / max(status.all_time_download, 1)
+            save_path = metadata.get('save_path', str(DOWNLOAD_DIR))
+            completed_info = TorrentInfo(
+                id=torrent_id,
+                name=name,
+                state="completed",
+                progress=100.0,
+                download_rate=0,
+                upload_rate=0,
+                num_peers=0,
+                num_seeds=0,
+                total_size=status.total_wanted,
+                downloaded=status.total_wanted,
+                uploaded=status.all_time_upload,
+                ratio=ratio,
+                eta=0,
+                save_path=save_path,
+                added_time=metadata.get('added_time', time.time())
+            )
+            record.completed_info = completed_info
+            record.completed_files = {
+                "files": files_snapshot,
+                "save_path": save_path,
+                "name": name,
+            }
 
             # Remove torrent from session to close all connections, keep files on disk
-            try:
-                if self.session and handle.is_valid():
-                    self.session.remove_torrent(handle)
-            except Exception:
-                pass
+            if self.session:
+                self.session.remove_torrent(handle)
 
             metadata['stopped_on_complete'] = True
             # Use snapshot_time to keep zip cache freshness aligned
             metadata['completed_at'] = snapshot_time
-            self.torrent_metadata[torrent_id] = metadata
             # Also drop from active handle map
-            if torrent_id in self.torrents:
-                self.torrents.pop(torrent_id, None)
-            logger.info(f"Stopped seeding after completion: {status.name}")
-        except Exception as e:
+            self._untrack_handle(torrent_id)
+            logger.info(f"Stopped seeding after completion: {name}")
+        except RuntimeError as e:
+            # libtorrent raises RuntimeError, e.g. if the handle went away mid-way
             logger.warning(f"Failed to stop seeding for {torrent_id}: {e}")
     
-    def add_torrent_file(self, torrent_data: bytes, save_path: Optional[str] = None, sequential: bool = False) -> str:
+    async def add_torrent_file(self, torrent_data: bytes, save_path: Optional[str] = None, sequential: bool = False) -> str:
         """Add torrent from .torrent file"""
         if not self.session:
             raise RuntimeError("Session not initialized")
@@ -564,69 +881,50 @@ class TorrentManager:
         # Save torrent file
         torrent_file.write_bytes(torrent_data)
         
-        params = {
-            'save_path': str(save_path or DOWNLOAD_DIR),
-            'storage_mode': lt.storage_mode_t.storage_mode_sparse,
-            'ti': lt.torrent_info(str(torrent_file)),
-            'flags': lt.torrent_flags.auto_managed | lt.torrent_flags.duplicate_is_error,
-        }
-        
-        if sequential:
-            params['flags'] |= lt.torrent_flags.sequential_download
-        
         try:
-            handle = self.session.add_torrent(params)
-            self.torrents[torrent_id] = handle
-            self.torrent_metadata[torrent_id] = {
+            # Parse off the event loop - large torrents take a while to bdecode
+            torrent_info = await asyncio.to_thread(lt.torrent_info, str(torrent_file))
+            params = self._build_add_params(save_path, sequential, ti=torrent_info)
+            self._submit_add(torrent_id, params, {
                 'added_time': time.time(),
                 'torrent_file': str(torrent_file),
-                'save_path': params['save_path'],
+                'save_path': params.save_path,
                 'stopped_on_complete': False
-            }
-            
-            # Apply speed boost
-            self.boost_torrent_speed(handle)
-            
-            logger.info(f"Added torrent {torrent_id} from file")
-            
-            # Immediately broadcast to WebSocket clients
-            asyncio.create_task(self.broadcast_update())
+            })
             
+            logger.info(f"Queued torrent {torrent_id} from file")
             return torrent_id
             
         except Exception as e:
             logger.error(f"Failed to add torrent file: {e}")
+            self._forget_record(torrent_id)
             torrent_file.unlink(missing_ok=True)
             raise HTTPException(status_code=400, detail=str(e))
     
     def remove_torrent(self, torrent_id: str, delete_files: bool = False):
         """Remove a torrent"""
-        if torrent_id in self.torrents:
-            handle = self.torrents[torrent_id]
+        record = self.records.get(torrent_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Torrent not found")
 
+        if record.handle is None and record.completed_info is None:
+            # Add still pending: there is no handle to remove yet, so have
+            # _on_add_torrent drop it from the session when it lands
+            if record.hash_key is not None:
+                self._cancelled_adds[record.hash_key] = delete_files
+            self._untrack_handle(torrent_id)
+            log_message = f"Cancelled pending torrent {torrent_id}"
+        elif record.handle is not None:
             # Remove from session
             if delete_files:
-                self.session.remove_torrent(handle, lt.options_t.delete_files)
+                self.session.remove_torrent(record.handle, lt.options_t.delete_files)
             else:
-                self.session.remove_torrent(handle)
-
-            # Cleanup
-            del self.torrents[torrent_id]
-            if torrent_id in self.torrent_metadata:
-                metadata = self.torrent_metadata[torrent_id]
-                if 'torrent_file' in metadata:
-                    Path(metadata['torrent_file']).unlink(missing_ok=True)
-                del self.torrent_metadata[torrent_id]
-            # Remove cached zip if present
-            zip_path = TEMP_DIR / f"{torrent_id}.zip"
-            zip_path.unlink(missing_ok=True)
-            
-            logger.info(f"Removed torrent {torrent_id}")
-            return
-
-        if torrent_id in self.completed_torrents:
+                self.session.remove_torrent(record.handle)
+            self._untrack_handle(torrent_id)
+            log_message = f"Removed torrent {torrent_id}"
+        else:
             if delete_files:
-                entry = self.completed_files.get(torrent_id, {})
+                entry = record.completed_files or {}
                 files_entry = entry.get("files", [])
                 for file_entry in files_entry:
                     try:
@@ -635,7 +933,7 @@ class TorrentManager:
                         pass
 
                 # Attempt to clean up empty directories under save_path
-                save_path = entry.get("save_path") or self.torrent_metadata.get(torrent_id, {}).get('save_path')
+                save_path = entry.get("save_path") or record.metadata.get('save_path')
                 if save_path:
                     try:
                         p = Path(save_path)
@@ -649,34 +947,23 @@ class TorrentManager:
                                     break
                     except Exception:
                         pass
+            log_message = f"Removed completed torrent {torrent_id}"
 
-            self.completed_torrents.pop(torrent_id, None)
-            self.completed_files.pop(torrent_id, None)
-            if torrent_id in self.torrent_metadata:
-                metadata = self.torrent_metadata[torrent_id]
-                if 'torrent_file' in metadata:
-                    Path(metadata['torrent_file']).unlink(missing_ok=True)
-                del self.torrent_metadata[torrent_id]
+        # Cleanup
+        self._forget_record(torrent_id)
+        if 'torrent_file' in record.metadata:
+            Path(record.metadata['torrent_file']).unlink(missing_ok=True)
 
-            # Remove cached zip if present
-            zip_path = TEMP_DIR / f"{torrent_id}.zip"
-            zip_path.unlink(missing_ok=True)
-
-            logger.info(f"Removed completed torrent {torrent_id}")
-            return
+        # Remove cached zip if present
+        self._zip_locks.pop(torrent_id, None)
+        zip_path = TEMP_DIR / f"{torrent_id}.zip"
+        zip_path.unlink(missing_ok=True)
 
-        raise HTTPException(status_code=404, detail="Torrent not found")
+        self.request_broadcast()
+        logger.info(log_message)
     
-    def get_torrent_info(self, torrent_id: str) -> TorrentInfo:
-        """Get detailed torrent information"""
-        if torrent_id not in self.torrents:
-            if torrent_id in self.completed_torrents:
-                return self.completed_torrents[torrent_id]
-            raise HTTPException(status_code=404, detail="Torrent not found")
-        
-        handle = self.torrents[torrent_id]
-        status = handle.status()
-        
+    def _build_info(self, torrent_id: str, record: TorrentRecord, status: lt.torrent_status) -> TorrentInfo:
+        """Convert a libtorrent status into the API model"""
         # Calculate ETA
         if status.download_rate > 0:
             eta = int((status.total_wanted - status.total_wanted_done) / status.download_rate)
@@ -686,11 +973,11 @@ class TorrentManager:
         # Calculate ratio
         ratio = status.all_time_upload / max(status.all_time_download, 1)
         
-        metadata = self.torrent_metadata.get(torrent_id, {})
+        metadata = record.metadata
         
         return TorrentInfo(
             id=torrent_id,
-            name=status.name,
+            name=status.name or metadata.get('name', ''),
             state=str(status.state),
             progress=status.progress * 100,
             download_rate=status.download_rate,
@@ -706,16 +993,44 @@ class TorrentManager:
             added_time=metadata.get('added_time', 0)
         )
 
+    def _record_info(self, torrent_id: str, record: TorrentRecord) -> TorrentInfo:
+        """Current TorrentInfo for a record (served from the alert-fed cache)"""
+        if record.info is not None:
+            return record.info
+        if record.completed_info is not None:
+            return record.completed_info
+        
+        # Add still in flight, or no state_update_alert for it yet. Never call
+        # handle.status() from here: it serializes against the libtorrent thread.
+        return TorrentInfo(
+            id=torrent_id, name="", state="adding", progress=0,
+            download_rate=0, upload_rate=0, num_peers=0, num_seeds=0,
+            total_size=0, downloaded=0, uploaded=0, ratio=0, eta=-1,
+            save_path=record.metadata.get('save_path', str(DOWNLOAD_DIR)),
+            added_time=record.metadata.get('added_time', 0)
+        )
+
+    def get_torrent_info(self, torrent_id: str) -> TorrentInfo:
+        """Get detailed torrent information"""
+        record = self.records.get(torrent_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Torrent not found")
+        return self._record_info(torrent_id, record)
+
     def get_torrent_files(self, torrent_id: str):
         """Return torrent files with absolute paths for download."""
-        if torrent_id in self.torrents:
-            handle = self.torrents[torrent_id]
-            try:
-                info = handle.get_torrent_info()
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Could not read torrent metadata: {e}")
+        record = self.records.get(torrent_id)
+        if record is not None and record.handle is not None:
+            # File layout never changes once metadata is known, so build it once
+            cached = record.metadata.get('files_cache')
+            if cached is not None:
+                return cached
 
-            save_path = Path(self.torrent_metadata.get(torrent_id, {}).get('save_path', str(DOWNLOAD_DIR)))
+            info = record.handle.torrent_file()  # None until metadata is known
+            if info is None:
+                raise HTTPException(status_code=404, detail="metadata not available yet")
+
+            save_path = Path(record.metadata.get('save_path', str(DOWNLOAD_DIR)))
 
             files_storage = info.files()
             files = []
@@ -724,140 +1039,363 @@ class TorrentManager:
                 abs_path = save_path / rel_path
                 files.append({
                     "relative_path": rel_path,
+                    "rel_norm": rel_path.replace('\\', '/'),  # For string matching of ?file=
                     "absolute_path": abs_path,
+                    "name": abs_path.name,
                     "size": files_storage.file_size(idx)
                 })
 
+            record.metadata['files_cache'] = (files, info.name())
             return files, info.name()
 
-        if torrent_id in self.completed_files:
-            entry = self.completed_files[torrent_id]
+        if record is not None and record.completed_files is not None:
+            entry = record.completed_files
             return entry.get("files", []), entry.get("name", "download")
 
         raise HTTPException(status_code=404, detail="Torrent not found or already stopped")
 
-    def build_zip_if_needed(self, torrent_id: str, files: List[dict], torrent_name: str, snapshot_time: float):
-        """Return path to a cached zip, rebuilding only when needed."""
+    def safe_base(self, torrent_id: str, torrent_name: str) -> str:
+        """Filesystem-safe download name, memoized in the torrent's metadata.
+        Call from the event loop only; zip builds get the result passed in."""
+        record = self.records.get(torrent_id)
+        metadata = record.metadata if record is not None else {}
+        safe_base = metadata.get('safe_base')
+        if safe_base is None:
+            safe_base = (torrent_name or "download").translate(_SAFE_TRANS).strip() or "download"
+            metadata['safe_base'] = safe_base
+        return safe_base
+
+    def build_zip_if_needed(self, torrent_id: str, files: List[dict], snapshot_time: Optional[float]) -> Path:
+        """Return path to a cached zip, rebuilding only when needed. snapshot_time is
+        when the files last changed; None means take it from their mtimes."""
         zip_path = TEMP_DIR / f"{torrent_id}.zip"
-        safe_base = "".join(c for c in (torrent_name or "download") if c not in "\\/:*?\"<>|").strip() or "download"
+        if snapshot_time is None:
+            snapshot_time = max(os.path.getmtime(f["absolute_path"]) for f in files)
 
-        # Reuse cached zip when fresh
-        if zip_path.exists() and zip_path.stat().st_size > 0 and zip_path.stat().st_mtime >= snapshot_time:
-            return zip_path, safe_base
+        # Reuse cached zip when fresh (one stat call for the whole check)
+        try:
+            st = zip_path.stat()
+            if st.st_size > 0 and st.st_mtime >= snapshot_time:
+                return zip_path
+        except FileNotFoundError:
+            pass
 
         zip_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+        # Build under a private name and swap it in, so a response still streaming
+        # the previous zip keeps its file and nobody ever sees a partial one
+        tmp_path = zip_path.with_name(f"{zip_path.name}.{uuid.uuid4().hex}.part")
+        try:
+            with zipfile.ZipFile(tmp_path, "w") as zipf:
+                self._write_deflated(zipf, files)
+            os.replace(tmp_path, zip_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return zip_path
+
+    def _write_deflated(self, zipf: zipfile.ZipFile, files: List[dict]):
+        """Deflate files on the shared pool and append them in order. At most
+        ZIP_WORKERS parts are in flight, which bounds open temp files and the
+        extra TEMP_DIR space to a few files rather than the whole torrent."""
+        pending = deque()
+        try:
             for file_entry in files:
-                zipf.write(file_entry["absolute_path"], arcname=file_entry["relative_path"])
-
-        return zip_path, safe_base
+                pending.append(self._deflate_executor.submit(deflate_to_temp, file_entry))
+                if len(pending) >= ZIP_WORKERS:
+                    zinfo, part = pending.popleft().result()
+                    with part:
+                        append_deflated(zipf, zinfo, part)
+            while pending:
+                zinfo, part = pending.popleft().result()
+                with part:
+                    append_deflated(zipf, zinfo, part)
+        finally:
+            # On failure, drop what is still queued and close parts already made
+            for future in pending:
+                if not future.cancel() and future.exception() is None:
+                    future.result()[1].close()
+    
+    async def build_zip(self, torrent_id: str, files: List[dict], snapshot_time: Optional[float]) -> Path:
+        """Run build_zip_if_needed on the zip executor so the event loop keeps serving"""
+        loop = asyncio.get_running_loop()
+        lock = self._zip_locks.setdefault(torrent_id, asyncio.Lock())
+        async with lock:
+            zip_path = await loop.run_in_executor(
+                self._zip_executor,
+                self.build_zip_if_needed,
+                torrent_id,
+                files,
+                snapshot_time,
+            )
+        # remove_torrent may have run while the build was in the executor; its
+        # zip cleanup came too early, so drop the archive that just landed
+        if torrent_id not in self.records:
+            zip_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=404, detail="Torrent not found")
+        return zip_path
     
     def list_torrents(self) -> List[TorrentInfo]:
-        """List all torrents"""
-        active = [self.get_torrent_info(tid) for tid in self.torrents.keys()]
-        completed = list(self.completed_torrents.values())
-        return sorted(active + completed, key=lambda t: t.added_time, reverse=True)
+        """List all torrents, newest first"""
+        records = self.records
+        return [self._record_info(tid, records[tid]) for tid in self._sorted_ids]
     
+    def _active_handle(self, torrent_id: str) -> lt.torrent_handle:
+        """Handle of a torrent that is currently in the session, or 404"""
+        record = self.records.get(torrent_id)
+        if record is None or record.handle is None:
+            raise HTTPException(status_code=404, detail="Torrent not found")
+        return record.handle
+
     def pause_torrent(self, torrent_id: str):
         """Pause a torrent"""
-        if torrent_id not in self.torrents:
-            raise HTTPException(status_code=404, detail="Torrent not found")
-        handle = self.torrents[torrent_id]
+        handle = self._active_handle(torrent_id)
 
         # Keep the torrent paused until the user explicitly resumes it
-        try:
-            handle.unset_flags(lt.torrent_flags.auto_managed)
-        except Exception:
-            pass
-
+        handle.unset_flags(lt.torrent_flags.auto_managed)
         handle.pause()
+        self.refresh_status()
         logger.info(f"Paused torrent {torrent_id}")
     
     def resume_torrent(self, torrent_id: str):
         """Resume a torrent"""
-        if torrent_id not in self.torrents:
-            raise HTTPException(status_code=404, detail="Torrent not found")
-        handle = self.torrents[torrent_id]
+        handle = self._active_handle(torrent_id)
 
         # Re-enable auto management once the user resumes
-        try:
-            handle.set_flags(lt.torrent_flags.auto_managed)
-        except Exception:
-            pass
-
+        handle.set_flags(lt.torrent_flags.auto_managed)
         handle.resume()
+        self.refresh_status()
         logger.info(f"Resumed torrent {torrent_id}")
     
+    def refresh_status(self):
+        """Ask for fresh statuses now rather than at the next scheduled request.
+        The resulting state_update_alert replaces the records that changed."""
+        self._next_status_request = 0.0
+        self._alerts_ready.set()  # Wake the monitor out of a long idle wait
+
+    def _status_interval(self) -> float:
+        """Seconds until the next status request, by who is watching and what is moving"""
+        busy = False
+        for record in self.records.values():
+            if record.handle is None:
+                continue
+            info = record.info
+            if info is None or info.download_rate > 0 or info.state in BUSY_STATES:
+                busy = True
+                break
+        if busy:
+            return STATUS_INTERVAL_LIVE if self.websocket_clients else STATUS_INTERVAL_IDLE
+        return STATUS_INTERVAL_IDLE if self.websocket_clients else STATUS_INTERVAL_DORMANT
+    
+    def process_alerts(self) -> bool:
+        """Drain the libtorrent alert queue in one batch and dispatch the alerts we consume.
+        Returns True if torrent status changed."""
+        status_changed = False
+        for alert in self.session.pop_alerts():
+            try:
+                if isinstance(alert, lt.state_update_alert):
+                    self._on_state_update(alert)
+                    status_changed = status_changed or bool(alert.status)
+                elif isinstance(alert, lt.add_torrent_alert):
+                    self._on_add_torrent(alert)
+                elif isinstance(alert, lt.performance_alert):
+                    # e.g. send buffer watermark too low, outstanding disk buffer limit reached
+                    logger.warning(f"libtorrent performance warning: {alert.message()}")
+                elif isinstance(alert, (lt.torrent_error_alert, lt.file_error_alert)):
+                    logger.error(f"libtorrent error: {alert.message()}")
+                elif DEBUG_ALERTS:
+                    logger.debug(f"{alert.what()}: {alert.message()}")
+            except Exception as e:
+                logger.error(f"Error handling {alert.what()}: {e}")
+        return status_changed
+
+    def _on_state_update(self, alert: lt.state_update_alert):
+        """Refresh cached info for changed torrents and stop completed ones"""
+        for status in alert.status:
+            torrent_id = next(
+                (self._hash_to_id[key] for key in info_hash_keys(status.info_hashes) if key in self._hash_to_id),
+                None
+            )
+            record = self.records.get(torrent_id)
+            if record is None or record.handle is None:
+                continue
+            try:
+                # Stop seeding once complete (keep files)
+                if status.progress >= 1.0:
+                    self.stop_if_completed(torrent_id, status.handle, status)
+                    continue
+                record.info = self._build_info(torrent_id, record, status)
+            except RuntimeError as e:
+                # libtorrent raises RuntimeError, e.g. for a handle removed mid-batch
+                logger.warning(f"Error processing status for {torrent_id}: {e}")
+
+    def _diff_torrents(self, torrents: List[TorrentInfo]) -> Tuple[List[dict], List[str]]:
+        """Diff torrent state against what clients last received; returns (changed, removed)"""
+        current: Dict[str, dict] = {}
+        infos: Dict[str, TorrentInfo] = {}
+        changed = []
+        for info in torrents:
+            infos[info.id] = info
+            # Cached infos are only replaced when an alert reports a change, so
+            # an idle torrent is the very same object as last tick
+            if self._last_infos.get(info.id) is info:
+                current[info.id] = self._last_sent[info.id]
+                continue
+            data = info.to_dict()
+            current[info.id] = data
+            previous = self._last_sent.get(info.id)
+            if previous is None:
+                changed.append(data)
+                continue
+            delta = {key: value for key, value in data.items() if previous.get(key) != value}
+            if delta:
+                delta['id'] = info.id
+                changed.append(delta)
+
+        removed = [tid for tid in self._last_sent if tid not in current]
+        self._last_sent = current
+        self._last_infos = infos
+        if changed or removed:
+            self._snapshot_bytes = None
+        return changed, removed
+
+    def _snapshot_payload(self) -> bytes:
+        """Full-state frame matching the current position of the delta stream.
+        Encoded once per state change, however many clients connect or fall behind."""
+        if self._snapshot_bytes is None:
+            self._snapshot_bytes = orjson.dumps({
+                'type': 'update',
+                'seq': self._seq,
+                'torrents': list(self._last_sent.values())
+            })
+        return self._snapshot_bytes
+
+    def _send_to_clients(self, payload: bytes):
+        """Queue one pre-encoded frame for every client without waiting on any socket"""
+        snapshot = None
+        for relay in self.websocket_clients.values():
+            try:
+                relay.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Too far behind for deltas to help: swap the backlog for one snapshot
+                while not relay.queue.empty():
+                    relay.queue.get_nowait()
+                if snapshot is None:
+                    snapshot = self._snapshot_payload()
+                relay.queue.put_nowait(snapshot)
+
+    async def _relay(self, relay: ClientRelay):
+        """Per-client task: forward queued frames so a slow socket only delays itself"""
+        websocket = relay.websocket
+        try:
+            while True:
+                payload = await relay.queue.get()
+                await asyncio.wait_for(websocket.send_bytes(payload), timeout=WS_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            # A timed-out send may have left a partial frame; close so the
+            # browser reconnects and resyncs instead of silently stalling
+            self.websocket_clients.pop(websocket, None)
+            await self._close_client(websocket)
+        except (WebSocketDisconnect, RuntimeError, OSError):
+            self.websocket_clients.pop(websocket, None)
+
+    @staticmethod
+    async def _close_client(client: WebSocket):
+        """Close a dropped client, ignoring sockets that are already gone"""
+        try:
+            await client.close(code=1011)
+        except RuntimeError:
+            pass
+
+    async def _flush_delta(self):
+        """Diff current state against the last frame and send the changes, if any"""
+        changed, removed = self._diff_torrents(self.list_torrents())
+        if not (changed or removed) or not self.websocket_clients:
+            return
+
+        self._seq += 1
+        payload = orjson.dumps({
+            'type': 'delta',
+            'seq': self._seq,
+            'changed': changed,
+            'removed': removed
+        })
+        self._send_to_clients(payload)
+
+    async def register_client(self, websocket: WebSocket):
+        """Add a WebSocket client; its first frame is a full baseline for the delta stream"""
+        # Bring existing clients up to date so the baseline matches what they have
+        await self._flush_delta()
+        relay = ClientRelay(websocket)
+        relay.queue.put_nowait(self._snapshot_payload())
+        relay.task = asyncio.create_task(self._relay(relay))
+        self.websocket_clients[websocket] = relay
+        # Someone is watching now; don't wait out a dormant interval
+        self.refresh_status()
+
+    async def unregister_client(self, websocket: WebSocket):
+        """Forget a WebSocket client and wait for its relay task to stop"""
+        relay = self.websocket_clients.pop(websocket, None)
+        if relay is not None and relay.task is not None:
+            relay.task.cancel()
+            # gather still propagates a cancellation of the caller itself
+            await asyncio.gather(relay.task, return_exceptions=True)
+
     async def broadcast_update(self):
-        """Immediately broadcast current torrent state to all WebSocket clients"""
+        """Broadcast changed torrent fields to all WebSocket clients in a single frame"""
         if not self.websocket_clients:
             return
         
         try:
-            torrents_data = [info.model_dump() for info in self.list_torrents()]
-            disconnected = []
-            
-            for client in self.websocket_clients:
-                try:
-                    await client.send_json({
-                        'type': 'update',
-                        'torrents': torrents_data
-                    })
-                except Exception:
-                    disconnected.append(client)
-            
-            # Remove disconnected clients
-            for client in disconnected:
-                try:
-                    if client in self.websocket_clients:
-                        self.websocket_clients.remove(client)
-                except ValueError:
-                    pass
+            await self._flush_delta()
         except Exception as e:
             logger.error(f"Error broadcasting update: {e}")
     
+    def request_broadcast(self):
+        """Ask for a broadcast soon; many requests in a burst produce a single frame"""
+        self._bcast_pending.set()
+
+    async def _broadcast_worker(self):
+        """Background task serving request_broadcast() with a short coalescing window"""
+        while True:
+            await self._bcast_pending.wait()
+            self._bcast_pending.clear()
+            await asyncio.sleep(0.1)  # Let the rest of a burst land first
+            await self.broadcast_update()
+
     async def monitor_torrents(self):
-        """Background task to monitor torrents and send updates (optimized for speed)"""
+        """Background task: handle alerts as they arrive and broadcast status changes"""
+        loop = asyncio.get_running_loop()
         while True:
             try:
-                await asyncio.sleep(0.5)  # Update every 500ms for more responsive UI
-                
-                # Check for completed torrents and enable super-seeding
-                for torrent_id, handle in list(self.torrents.items()):
-                    try:
-                        status = handle.status()
-                        # Stop seeding once complete (keep files)
-                        if status.progress >= 1.0:
-                            self.stop_if_completed(torrent_id, handle, status)
-                    except Exception as e:
-                        logger.debug(f"Error checking torrent status: {e}")
+                # Ask libtorrent for changed statuses at an activity-dependent
+                # cadence; the answer comes back as a state_update_alert (only
+                # changed torrents)
+                now = loop.time()
+                if now >= self._next_status_request:
+                    self.session.post_torrent_updates(STATUS_QUERY_NAME)
+                    self._next_status_request = now + self._status_interval()
                 
-                # Always send updates even if no clients (they might connect soon)
-                # Get all torrent info
-                torrents_data = [info.model_dump() for info in self.list_torrents()]
+                # Sleep until alerts arrive or the next status request is due. Drain
+                # on timeout too: notify only fires when the queue goes from empty
+                # to non-empty, so anything queued before it was installed would
+                # otherwise sit there forever.
+                try:
+                    await asyncio.wait_for(
+                        self._alerts_ready.wait(),
+                        timeout=max(self._next_status_request - loop.time(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._alerts_ready.clear()
                 
-                # Broadcast to all connected clients
-                if self.websocket_clients:
-                    disconnected = []
-                    for client in self.websocket_clients:
-                        try:
-                            await client.send_json({
-                                'type': 'update',
-                                'torrents': torrents_data
-                            })
-                        except Exception:
-                            disconnected.append(client)
-                    
-                    # Remove disconnected clients safely
-                    for client in disconnected:
-                        try:
-                            if client in self.websocket_clients:
-                                self.websocket_clients.remove(client)
-                        except ValueError:
-                            pass  # Already removed
+                # Push changes as soon as libtorrent reports them
+                if self.process_alerts():
+                    await self.broadcast_update()
                     
             except Exception as e:
                 logger.error(f"Error in monitor task: {e}")
+                await asyncio.sleep(MONITOR_ERROR_BACKOFF)
 
 # -----------------------
 # Global Manager Instance
@@ -878,7 +1416,8 @@ app = FastAPI(
     title="High-Speed Torrent Downloader",
     description="Modern async torrent client API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -899,8 +1438,6 @@ async def api_info():
 
 @app.get("/health")
 async def health_check():
-    import shutil
-    
     # Get disk usage for download directory
     try:
         disk_usage = shutil.disk_usage(DOWNLOAD_DIR)
@@ -921,7 +1458,7 @@ async def health_check():
     
     return {
         "status": "healthy",
-        "active_torrents": len(torrent_manager.torrents),
+        "active_torrents": sum(1 for r in torrent_manager.records.values() if r.handle is not None),
         "dht_enabled": DHT_ENABLED,
         "storage": storage_info
     }
@@ -965,7 +1502,7 @@ async def upload_torrent_file(
     
     try:
         torrent_data = await file.read()
-        torrent_id = torrent_manager.add_torrent_file(torrent_data, save_path, sequential)
+        torrent_id = await torrent_manager.add_torrent_file(torrent_data, save_path, sequential)
         return {
             "success": True,
             "torrent_id": torrent_id,
@@ -978,12 +1515,13 @@ async def upload_torrent_file(
 async def list_all_torrents():
     """List all torrents"""
     torrents = torrent_manager.list_torrents()
-    return JSONResponse(content=[t.model_dump() for t in torrents], headers={"Cache-Control": "no-store"})
+    # orjson serializes the dataclasses directly, no intermediate dicts
+    return ORJSONResponse(content=torrents, headers={"Cache-Control": "no-store"})
 
 @app.get("/api/torrents/{torrent_id}", response_model=TorrentInfo)
 async def get_torrent(torrent_id: str):
     """Get specific torrent information"""
-    return torrent_manager.get_torrent_info(torrent_id)
+    return ORJSONResponse(content=torrent_manager.get_torrent_info(torrent_id))
 
 @app.delete("/api/torrents/{torrent_id}")
 async def delete_torrent(torrent_id: str, delete_files: bool = False):
@@ -1004,62 +1542,90 @@ async def resume_download(torrent_id: str):
     return {"success": True, "message": "Torrent resumed"}
 
 
+class LargeFileResponse(FileResponse):
+    """FileResponse reading 1 MiB per chunk instead of Starlette's 64 KiB. Uvicorn has
+    no zero-copy send extension, so every chunk is a threadpool read plus a socket
+    write; bigger chunks mean far fewer of both on multi-GB torrent files."""
+    chunk_size = FILE_CHUNK_SIZE
+
+
+def zip_stream_response(files: List[dict], safe_base: str) -> StreamingResponse:
+    """STORE-only zip of files (all existing on disk), streamed without a temp file"""
+    # Torrent payloads are usually already compressed; deflate would only burn CPU
+    archive = ZipStream(compress_type=zipfile.ZIP_STORED, sized=True)
+    for file_entry in files:
+        archive.add_path(str(file_entry["absolute_path"]), file_entry["relative_path"])
+
+    # The sync iterator is drained in Starlette's threadpool, so file reads stay off the loop
+    return StreamingResponse(
+        archive,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": content_disposition(f"{safe_base}.zip"),
+            "Content-Length": str(len(archive)),
+        },
+    )
+
+
 @app.get("/api/torrents/{torrent_id}/download")
-async def download_torrent_files(torrent_id: str, background_tasks: BackgroundTasks, file: Optional[str] = None):
-    """Download torrent contents. Single file returns directly; multi-file torrents are zipped."""
+async def download_torrent_files(torrent_id: str, background_tasks: BackgroundTasks, file: Optional[str] = None,
+                                 compress: bool = False):
+    """Download torrent contents. Single file returns directly; multi-file torrents are
+    streamed as a STORE-only zip, or served from a cached deflated zip with compress=true."""
     files, torrent_name = torrent_manager.get_torrent_files(torrent_id)
 
-    existing_files = []
-    for f in files:
-        abs_path = Path(f["absolute_path"])
-        if abs_path.exists():
-            existing_files.append({**f, "absolute_path": abs_path})
+    existing_files = [f for f in files if os.path.exists(f["absolute_path"])]
     if not existing_files:
         raise HTTPException(status_code=404, detail="No files available yet. The torrent may still be downloading.")
 
     if file:
-        requested = Path(file)
-        if requested.is_absolute() or any(part in ("..", "") for part in requested.parts):
+        # Compare as normalized strings; entries carry a precomputed rel_norm
+        requested = file.replace('\\', '/')
+        if requested.startswith('/') or any(part in ("..", "") for part in requested.split('/')):
             raise HTTPException(status_code=400, detail="Invalid file path")
 
         for file_entry in existing_files:
-            if Path(file_entry["relative_path"]) == requested:
-                return FileResponse(
+            if file_entry["rel_norm"] == requested:
+                return LargeFileResponse(
                     file_entry["absolute_path"],
-                    filename=Path(file_entry["absolute_path"]).name,
+                    filename=file_entry["name"],
                     media_type="application/octet-stream",
                 )
 
         raise HTTPException(status_code=404, detail="Requested file not found in torrent contents")
 
-    safe_base = "".join(c for c in (torrent_name or "download") if c not in '\\/:*?"<>|').strip() or "download"
-
     if len(existing_files) == 1:
         file_entry = existing_files[0]
-        return FileResponse(
+        return LargeFileResponse(
             file_entry["absolute_path"],
-            filename=Path(file_entry["absolute_path"]).name,
+            filename=file_entry["name"],
             media_type="application/octet-stream",
         )
 
-    snapshot_time = torrent_manager.torrent_metadata.get(torrent_id, {}).get('completed_at', time.time())
+    safe_base = torrent_manager.safe_base(torrent_id, torrent_name)
+    if not compress:
+        return zip_stream_response(existing_files, safe_base)
+
+    # Completed torrents are frozen at completion; active ones go by file mtimes
+    record = torrent_manager.records.get(torrent_id)
+    snapshot_time = record.metadata.get('completed_at') if record else None
 
     try:
-        zip_path, safe_base = torrent_manager.build_zip_if_needed(
+        zip_path = await torrent_manager.build_zip(
             torrent_id,
             existing_files,
-            torrent_name,
             snapshot_time,
         )
 
-        return FileResponse(
+        return LargeFileResponse(
             zip_path,
             filename=f"{safe_base}.zip",
             media_type="application/zip",
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        # In case of partial/corrupt zip, remove and raise
-        (TEMP_DIR / f"{torrent_id}.zip").unlink(missing_ok=True)
+        # Builds are atomic, so there is no partial zip to clean up here
         raise HTTPException(status_code=500, detail=f"Failed to prepare download: {e}")
 
 
@@ -1070,8 +1636,7 @@ async def list_torrent_files(torrent_id: str):
 
     available_files = []
     for file_entry in files:
-        abs_path = Path(file_entry["absolute_path"])
-        if abs_path.exists():
+        if os.path.exists(file_entry["absolute_path"]):
             available_files.append({
                 "relative_path": file_entry["relative_path"],
                 "size": file_entry.get("size", 0)
@@ -1086,7 +1651,7 @@ async def list_torrent_files(torrent_id: str):
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket for real-time torrent updates"""
     await websocket.accept()
-    torrent_manager.websocket_clients.append(websocket)
+    await torrent_manager.register_client(websocket)
     logger.info(f"WebSocket client connected. Total: {len(torrent_manager.websocket_clients)}")
     
     try:
@@ -1094,19 +1659,13 @@ async def websocket_endpoint(websocket: WebSocket):
             # Keep connection alive and handle ping/pong
             await websocket.receive_text()
     except WebSocketDisconnect:
-        try:
-            if websocket in torrent_manager.websocket_clients:
-                torrent_manager.websocket_clients.remove(websocket)
-        except ValueError:
-            pass
-        logger.info(f"WebSocket client disconnected. Remaining: {len(torrent_manager.websocket_clients)}")
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        try:
-            if websocket in torrent_manager.websocket_clients:
-                torrent_manager.websocket_clients.remove(websocket)
-        except ValueError:
-            pass
+    finally:
+        # Safe if the relay already dropped this client (dict pop, no membership scan)
+        await torrent_manager.unregister_client(websocket)
+        logger.info(f"WebSocket client disconnected. Remaining: {len(torrent_manager.websocket_clients)}")
 
 # Mount static files for web interface (must be last)
 try:
@@ -1118,4 +1677,12 @@ except Exception as e:
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080, log_level="info")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8080,
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        ws="websockets"
+    )
@@ -4,26 +4,42 @@ let ws = null;
 let reconnectTimeout = null;
 let lastTorrentsHash = '';
 let pollInterval = null; // fallback polling when WebSocket unavailable
+let torrentState = new Map(); // torrent id -> latest known fields
+let lastSeq = null; // sequence number of the last WebSocket frame applied
+const frameDecoder = new TextDecoder();
 
 // Connect to WebSocket for real-time updates
 function connectWebSocket() {
     const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
     ws = new WebSocket(`${wsProtocol}//${window.location.host}/ws`);
+    ws.binaryType = 'arraybuffer'; // server sends pre-encoded JSON as binary frames
     
     ws.onopen = () => {
         console.log('WebSocket connected');
         clearTimeout(reconnectTimeout);
-        // Force immediate data load to sync state
+        // Server sends a full snapshot right after connect to sync state
         lastTorrentsHash = ''; // Reset hash to force render
-        loadTorrents();
+        lastSeq = null;
         stopPolling(); // stop fallback polling once WS is live
     };
     
     ws.onmessage = (event) => {
-        const data = JSON.parse(event.data);
+        const text = typeof event.data === 'string' ? event.data : frameDecoder.decode(event.data);
+        const data = JSON.parse(text);
         if (data.type === 'update') {
             console.log('WebSocket update received:', data.torrents.length, 'torrents');
-            updateTorrentsList(data.torrents);
+            lastSeq = data.seq;
+            applySnapshot(data.torrents);
+        } else if (data.type === 'delta') {
+            if (lastSeq !== null && data.seq !== lastSeq + 1) {
+                // Missed a frame - resync the full list over HTTP
+                console.warn(`WebSocket gap: expected seq ${lastSeq + 1}, got ${data.seq}`);
+                lastSeq = data.seq;
+                loadTorrents();
+                return;
+            }
+            lastSeq = data.seq;
+            applyDelta(data.changed, data.removed);
         }
     };
     
@@ -175,7 +191,7 @@ async function loadTorrents() {
         }
         const torrents = await response.json();
         console.log(`[poll] ${now.toLocaleTimeString()} fetched ${torrents.length} torrents`);
-        updateTorrentsList(torrents);
+        applySnapshot(torrents);
     } catch (error) {
         console.error('Error loading torrents:', error);
         const container = document.getElementById('torrents-container');
@@ -185,6 +201,29 @@ async function loadTorrents() {
     }
 }
 
+// Replace the known torrent state with a full list
+function applySnapshot(torrents) {
+    torrentState = new Map((torrents || []).map(t => [t.id, t]));
+    renderTorrentState();
+}
+
+// Merge changed fields into the known state and drop removed torrents
+function applyDelta(changed, removed) {
+    (changed || []).forEach(delta => {
+        const existing = torrentState.get(delta.id);
+        torrentState.set(delta.id, existing ? { ...existing, ...delta } : delta);
+    });
+    (removed || []).forEach(id => torrentState.delete(id));
+    renderTorrentState();
+}
+
+// Render known state, newest first
+function renderTorrentState() {
+    const torrents = Array.from(torrentState.values())
+        .sort((a, b) => (b.added_time || 0) - (a.added_time || 0));
+    updateTorrentsList(torrents);
+}
+
 // Update torrents list - OPTIMIZED for real-time updates
 function updateTorrentsList(torrents) {
     const container = document.getElementById('torrents-container');
@@ -522,10 +561,11 @@ async function downloadTorrent(id) {
 
 function triggerDownload(torrentId, relativePath = null, asZip = false) {
     const link = document.createElement('a');
-    if (asZip || !relativePath) {
-        link.href = `${API_BASE}/api/torrents/${torrentId}/download`;
-    } else {
+    if (relativePath && !asZip) {
         link.href = `${API_BASE}/api/torrents/${torrentId}/download?file=${encodeURIComponent(relativePath)}`;
+    } else {
+        // Single-file torrents come back as the file itself, multi-file ones as a streamed zip
+        link.href = `${API_BASE}/api/torrents/${torrentId}/download`;
     }
     link.target = '_blank';
     link.rel = 'noopener';